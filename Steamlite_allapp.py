@@ -1,7 +1,7 @@
 import streamlit as st
-import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 import pandas as pd # Needed for st.dataframe
+import time
 import plotly.express as px # For the overview tab (even if not used in this specific "normal" app, good to have)
 
 # --- Database Connection Details ---
@@ -14,6 +14,14 @@ DB_CONFIG = {
     'database': 'dnd_database'   # The name of your D&D database
 }
 
+# Connection pool settings: connections are borrowed per CRUD call and returned on close()
+POOL_CONFIG = {
+    'pool_name': 'dnd',
+    'pool_size': 5,
+    'pool_reset_session': False, # Skip the COM_RESET_CONNECTION round-trip on checkout
+    'autocommit': True           # Reads must not leave an open snapshot on a pooled connection
+}
+
 # --- Generic CRUD Configuration (formerly in config.py) ---
 # This defines which D&D table the generic CRUD operations will apply to.
 # We are setting it to manage 'Characters' for your D&D app.
@@ -29,59 +37,181 @@ COLUMNS = {
     "gold": "INTEGER"        # This will be the character's gold
 }
 
+# --- SQL Statements ---
+# Built once at import time; TABLE_NAME never changes while the app runs, and
+# identical strings let execute_prepared() reuse its prepared statements.
+SQL_FETCH_CHARACTERS = f"""
+    SELECT
+        C.creature_id AS id,
+        C.creature_name AS creature_name,
+        T.gold AS gold
+    FROM
+        Creatures AS C
+    JOIN
+        {TABLE_NAME} AS T ON C.creature_id = T.character_id
+    WHERE
+        C.creature_type = 'Character'
+    ORDER BY C.creature_name
+"""
+CHARACTER_COLUMNS = ("id", "creature_name", "gold")
+SQL_FETCH_GENERIC = f"SELECT * FROM {TABLE_NAME} ORDER BY id"
+SQL_CALL_UPSERT_CHARACTER = "CALL sp_upsert_character(%s, %s)"
+# One UPDATE per combination of provided values, keyed on (has_name, has_gold). Built once:
+# the prepared cursor only reuses a statement when it is handed the very same string object.
+SQL_UPDATE_CHARACTER = {
+    (True, True): f"""
+        UPDATE Creatures AS C
+        JOIN {TABLE_NAME} AS T ON C.creature_id = T.character_id
+        SET C.creature_name = %s, T.gold = %s
+        WHERE C.creature_id = %s
+    """,
+    (True, False): "UPDATE Creatures SET creature_name = %s WHERE creature_id = %s",
+    (False, True): f"UPDATE {TABLE_NAME} SET gold = %s WHERE character_id = %s",
+}
+SQL_DELETE_CREATURE = "DELETE FROM Creatures WHERE creature_id = %s"
+SQL_TRANSFER_GOLD = f"""
+    UPDATE {TABLE_NAME}
+    SET gold = CASE character_id WHEN %s THEN gold - %s WHEN %s THEN gold + %s END
+    WHERE character_id IN (%s, %s) AND (character_id <> %s OR gold >= %s)
+"""
+
 
 @st.cache_resource
+def get_pool():
+    """Creates and returns a MySQL connection pool shared by every session.
+    Uses st.cache_resource so the pool (and its open sockets) survives reruns."""
+    try:
+        return pooling.MySQLConnectionPool(**POOL_CONFIG, **DB_CONFIG)
+    except Error as e:
+        st.error(f"Error connecting to MySQL: {e}")
+        st.stop() # Stop the app if connection fails, preventing further errors
+        return None
+
 def get_connection():
-    """Establishes and returns a database connection.
-    Uses st.cache_resource to cache the connection for performance."""
+    """Borrows a connection from the pool.
+    Calling close() on it hands it back to the pool instead of disconnecting."""
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        return get_pool().get_connection()
     except Error as e:
         st.error(f"Error connecting to MySQL: {e}")
         st.stop() # Stop the app if connection fails, preventing further errors
         return None
 
+def release(conn, cursor):
+    """Closes cursor and hands conn back to the pool (close() on a pooled connection
+    returns it rather than disconnecting). The connection is returned even if
+    closing the cursor fails."""
+    try:
+        cursor.close()
+    finally:
+        conn.close()
+
+def execute_prepared(conn, sql, params):
+    """Executes sql as a server-side prepared statement and returns its cursor.
+    The statement is prepared once per pooled connection and reused afterwards, which
+    saves the server from parsing it again. The trade-off: mysql.connector sends a
+    COM_STMT_RESET and waits for its reply before every COM_STMT_EXECUTE, so each
+    reused call costs two round-trips where a plain cursor.execute() costs one.
+    The cursors are stored on the pool's underlying connection object, so they live and
+    die with it, and are dropped when a reconnect gives that connection a new
+    connection_id (old handles are gone). sql must be a module-level constant: the
+    prepared cursor only reuses a statement when handed the identical string object."""
+    cnx = getattr(conn, "_cnx", conn) # PooledMySQLConnection wraps the real connection
+    prepared = getattr(cnx, "_prepared_cursors", None)
+    if prepared is None or prepared[0] != cnx.connection_id:
+        prepared = (cnx.connection_id, {})
+        cnx._prepared_cursors = prepared
+    cursor = prepared[1].get(sql)
+    if cursor is None:
+        cursor = conn.cursor(prepared=True)
+        prepared[1][sql] = cursor
+    cursor.execute(sql, params)
+    return cursor
+
 # --- Generic CRUD Functions (adapted for MySQL and TABLE_NAME/COLUMNS) ---
 
+@st.cache_data(ttl=30, show_spinner=False) # Cleared with fetch_all.clear() after every write
 def fetch_all():
-    """Fetches all rows from the TABLE_NAME defined in this file.
-    Specifically adapted for 'Characters' table to join with 'Creatures' for name."""
+    """Fetches all rows from the TABLE_NAME defined in this file as a DataFrame.
+    Specifically adapted for 'Characters' table to join with 'Creatures' for name.
+    Errors are raised, not returned, so st.cache_data never caches a failed read."""
     conn = get_connection()
     if conn is None:
-        return []
-    cursor = conn.cursor(dictionary=True) # Returns rows as dictionaries
+        return pd.DataFrame()
+    cursor = conn.cursor() # Plain tuples; pandas builds the columns directly from them
     try:
         if TABLE_NAME == "Characters":
             # For Characters, we need to join with Creatures to get the creature_name
             # and use creature_id as the primary key for display/selection.
-            cursor.execute(f"""
-                SELECT
-                    C.creature_id AS id,
-                    C.creature_name AS creature_name,
-                    T.gold AS gold
-                FROM
-                    Creatures AS C
-                JOIN
-                    {TABLE_NAME} AS T ON C.creature_id = T.character_id
-                WHERE
-                    C.creature_type = 'Character'
-                ORDER BY C.creature_name
-            """)
+            cursor.execute(SQL_FETCH_CHARACTERS)
+            columns = CHARACTER_COLUMNS # Fixed (id, creature_name, gold) order of the SELECT list
         else:
             # Generic fetch for other tables if TABLE_NAME changes
             # Assumes 'id' as primary key for simplicity if not 'Characters'
-            cursor.execute(f"SELECT * FROM {TABLE_NAME} ORDER BY id")
-        
-        rows = cursor.fetchall()
-        return rows
-    except Error as e:
-        st.error(f"Error fetching data from {TABLE_NAME}: {e}")
-        return []
+            cursor.execute(SQL_FETCH_GENERIC)
+            columns = [col[0] for col in cursor.description]
+
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        release(conn, cursor)
+
+def load_rows():
+    """Returns the records to display on this rerun.
+    Right after a local insert the patched frame left by remember_inserted_row() is
+    used once instead of re-reading the table; otherwise fetch_all() is called."""
+    patched = st.session_state.pop("rows_df_patch", None)
+    if patched is not None and time.monotonic() - patched[0] < 2:
+        rows_df = patched[1]
+    else:
+        try:
+            rows_df = fetch_all()
+        except Error as e:
+            st.error(f"Error fetching data from {TABLE_NAME}: {e}")
+            return pd.DataFrame()
+    st.session_state["rows_df"] = rows_df
+    return rows_df
+
+def remember_inserted_row(creature_id, creature_name, gold):
+    """Applies an added/updated character to the last displayed frame, so the
+    rerun that follows an insert can skip fetch_all()."""
+    rows_df = st.session_state.get("rows_df")
+    if rows_df is None or list(rows_df.columns) != list(CHARACTER_COLUMNS):
+        return
+    new_row = pd.DataFrame([(creature_id, creature_name, gold)], columns=CHARACTER_COLUMNS)
+    patched = pd.concat([rows_df[rows_df['id'] != creature_id], new_row], ignore_index=True)
+    # Keep the ORDER BY creature_name order of SQL_FETCH_CHARACTERS (case-insensitive, like MySQL)
+    patched = patched.sort_values('creature_name', key=lambda names: names.str.lower(), ignore_index=True)
+    st.session_state["rows_df_patch"] = (time.monotonic(), patched)
+
+def build_display_maps(rows_df):
+    """Builds the selectbox labels and id lookups for rows_df.
+    Memoized in st.session_state on a hash of the frame's contents, so reruns caused
+    only by widget changes (e.g. typing a transfer amount) reuse the previous maps."""
+    fingerprint = (len(rows_df), int(pd.util.hash_pandas_object(rows_df, index=False).sum()))
+    cached = st.session_state.get("display_maps")
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    # Create display names for selectbox (assuming 'id' is present in the fetched rows)
+    if 'creature_name' in rows_df:
+        display_names = rows_df['creature_name'].astype(str)
+    else:
+        display_names = "ID: " + rows_df['id'].astype(str)
+    display_options = (display_names + " (ID: " + rows_df['id'].astype(str) + ")").tolist()
+
+    row_ids = rows_df['id'].tolist()
+    rows_by_id = rows_df.set_index('id')
+    maps = {
+        "row_ids": row_ids,
+        "id_to_display_name": dict(zip(row_ids, display_options)),
+        "rows_by_id": rows_by_id,
+    }
+    if TABLE_NAME == "Characters":
+        # to_dict() yields plain Python ints, which mysql.connector can bind as parameters
+        maps["id_name_map"] = rows_by_id['creature_name'].to_dict()
+        maps["id_gold_map"] = rows_by_id['gold'].to_dict()
+    st.session_state["display_maps"] = (fingerprint, maps)
+    return maps
 
 def insert_row(data):
     """Inserts a new row into the TABLE_NAME defined in this file.
@@ -91,45 +221,24 @@ def insert_row(data):
         return False
     cursor = conn.cursor()
     try:
-        conn.start_transaction() # Start transaction for multi-table insert
-
         if TABLE_NAME == "Characters":
-            # 1. Insert into Creatures table first
             creature_name = data.get("creature_name")
             gold = data.get("gold", 0) # Default gold to 0 if not provided
             
             if not creature_name:
                 raise ValueError("Character Name is required.")
 
-            # Check if creature_name already exists to avoid duplicates
-            cursor.execute("SELECT creature_id FROM Creatures WHERE creature_name = %s LIMIT 1", (creature_name,))
-            existing_creature = cursor.fetchone()
-
-            if existing_creature:
+            # One round-trip: sp_upsert_character (see schema_updates.sql) upserts Creatures,
+            # fills in the default race/class and upserts Characters in its own transaction
+            cursor.execute(SQL_CALL_UPSERT_CHARACTER, (creature_name, gold))
+            creature_id, is_new = cursor.fetchone()
+            while cursor.nextset(): # Drain the CALL's trailing status result
+                pass
+            if not is_new:
                 st.warning(f"Character '{creature_name}' already exists. Updating existing character's gold.")
-                creature_id = existing_creature[0]
-                cursor.execute(f"UPDATE {TABLE_NAME} SET gold = %s WHERE character_id = %s", (gold, creature_id))
-            else:
-                # Insert into Creatures
-                cursor.execute("""
-                    INSERT INTO Creatures (creature_type, creature_name, hit_points, armor_class, speed, size, level, is_homebrew)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """, ('Character', creature_name, 50, 10, 30, 'Medium', 1, False))
-                creature_id = cursor.lastrowid # Get the ID of the newly inserted creature
-
-                # 2. Insert into Characters table using the new creature_id
-                # For simplicity, we'll use default race/class IDs. You might want to add select boxes for these.
-                cursor.execute("SELECT race_id FROM Races WHERE race_name = 'Human' LIMIT 1")
-                default_race_id = cursor.fetchone()[0] if cursor.rowcount > 0 else 1
-                cursor.execute("SELECT class_id FROM Classes WHERE class_name = 'Fighter' LIMIT 1")
-                default_class_id = cursor.fetchone()[0] if cursor.rowcount > 0 else 1
-
-                cursor.execute(f"""
-                    INSERT INTO {TABLE_NAME} (character_id, race_id, class_id, gold)
-                    VALUES (%s, %s, %s, %s)
-                """, (creature_id, default_race_id, default_class_id, gold))
-            
-            conn.commit()
+
+            fetch_all.clear()
+            remember_inserted_row(creature_id, creature_name, gold)
             st.success(f"Character '{creature_name}' added/updated successfully!")
 
         else:
@@ -137,8 +246,8 @@ def insert_row(data):
             columns = ', '.join(data.keys())
             placeholders = ', '.join(['%s'] * len(data)) # MySQL uses %s as placeholder
             query = f"INSERT INTO {TABLE_NAME} ({columns}) VALUES ({placeholders})"
-            cursor.execute(query, tuple(data.values()))
-            conn.commit()
+            cursor.execute(query, tuple(data.values())) # Single statement, committed by autocommit
+            fetch_all.clear()
             st.success(f"Record added to {TABLE_NAME} successfully!")
         
         return True
@@ -147,13 +256,10 @@ def insert_row(data):
         conn.rollback()
         return False
     except ValueError as e:
-        st.error(f"Validation Error: {e}")
-        conn.rollback()
+        st.error(f"Validation Error: {e}") # Raised before any statement was sent
         return False
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        release(conn, cursor)
 
 def update_row(id_val, data):
     """Updates an existing row in the TABLE_NAME based on its primary key.
@@ -163,27 +269,27 @@ def update_row(id_val, data):
         return False
     cursor = conn.cursor()
     try:
-        conn.start_transaction() # Start transaction for multi-table update
-
+        # Each branch issues a single statement, which autocommit commits on its own
         if TABLE_NAME == "Characters":
-            # Update creature_name in Creatures table
+            # Update creature_name (Creatures) and gold (Characters) in one statement,
+            # skipping whichever value was not provided
             creature_name = data.get("creature_name")
-            if creature_name:
-                cursor.execute("UPDATE Creatures SET creature_name = %s WHERE creature_id = %s", (creature_name, id_val))
-            
-            # Update gold in Characters table
             gold = data.get("gold")
-            if gold is not None:
-                cursor.execute(f"UPDATE {TABLE_NAME} SET gold = %s WHERE character_id = %s", (gold, id_val))
-            
-            conn.commit()
+            has_name, has_gold = bool(creature_name), gold is not None
+            if has_name or has_gold:
+                params = [creature_name] if has_name else []
+                if has_gold:
+                    params.append(gold)
+                execute_prepared(conn, SQL_UPDATE_CHARACTER[(has_name, has_gold)], tuple(params) + (id_val,))
+
+            fetch_all.clear()
             st.success(f"Character (ID: {id_val}) updated successfully!")
         else:
             # Generic update for other tables (assuming 'id' as primary key)
             set_clause = ', '.join([f"{col}=%s" for col in data.keys()])
             query = f"UPDATE {TABLE_NAME} SET {set_clause} WHERE id = %s"
             cursor.execute(query, tuple(data.values()) + (id_val,))
-            conn.commit()
+            fetch_all.clear()
             if cursor.rowcount > 0:
                 st.success(f"Record (ID: {id_val}) in {TABLE_NAME} updated successfully!")
             else:
@@ -191,12 +297,9 @@ def update_row(id_val, data):
         return True
     except Error as e:
         st.error(f"Error updating data in {TABLE_NAME}: {e}")
-        conn.rollback()
         return False
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        release(conn, cursor)
 
 def delete_row(id_val):
     """Deletes a row from the TABLE_NAME based on its primary key.
@@ -206,28 +309,18 @@ def delete_row(id_val):
         return False
     cursor = conn.cursor()
     try:
-        conn.start_transaction() # Start transaction for multi-table deletion
-
+        # Each branch issues a single statement, which autocommit commits on its own
         if TABLE_NAME == "Characters":
-            # Delete from Character_Classes, Character_Spells, Character_Combats, Inventory first
-            cursor.execute("DELETE FROM Character_Classes WHERE character_id = %s", (id_val,))
-            cursor.execute("DELETE FROM Character_Spells WHERE character_id = %s", (id_val,))
-            cursor.execute("DELETE FROM Character_Combats WHERE creature_id = %s", (id_val,)) # creature_id in Character_Combats
-            cursor.execute("DELETE FROM Inventory WHERE creature_id = %s", (id_val,)) # creature_id in Inventory
-
-            # Then delete from Characters table
-            cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE character_id = %s", (id_val,))
-            
-            # Finally, delete from Creatures table
-            cursor.execute("DELETE FROM Creatures WHERE creature_id = %s", (id_val,))
-            
-            conn.commit()
+            # Character_Classes, Character_Spells, Character_Combats, Inventory and Characters
+            # rows go with it via their ON DELETE CASCADE foreign keys (see schema_cascade_fks.sql)
+            cursor.execute(SQL_DELETE_CREATURE, (id_val,))
+            fetch_all.clear()
             st.success(f"Character (ID: {id_val}) and associated data deleted successfully!")
         else:
             # Generic delete for other tables (assuming 'id' as primary key)
             query = f"DELETE FROM {TABLE_NAME} WHERE id = %s"
             cursor.execute(query, (id_val,))
-            conn.commit()
+            fetch_all.clear()
             if cursor.rowcount > 0:
                 st.success(f"Record (ID: {id_val}) deleted from {TABLE_NAME} successfully!")
             else:
@@ -235,12 +328,9 @@ def delete_row(id_val):
         return True
     except Error as e:
         st.error(f"Error deleting data from {TABLE_NAME}: {e}")
-        conn.rollback()
         return False
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        release(conn, cursor)
 
 # --- Transaction: Transfer Gold Between Characters (adapted from your transfer_age) ---
 
@@ -253,40 +343,113 @@ def transfer_gold(from_id, to_id, amount): # Renamed from transfer_age
     if conn is None:
         return False, "Database connection failed."
 
-    cursor = conn.cursor()
     try:
+        # Kept as an explicit transaction despite autocommit: if only one row matches
+        # (e.g. the sender is short of gold), the recipient's credit must be rolled back
         conn.start_transaction()
 
-        # 1. Get current gold for both characters
-        cursor.execute(f"SELECT gold FROM {TABLE_NAME} WHERE character_id = %s FOR UPDATE", (from_id,))
-        from_gold_data = cursor.fetchone()
-        cursor.execute(f"SELECT gold FROM {TABLE_NAME} WHERE character_id = %s FOR UPDATE", (to_id,))
-        to_gold_data = cursor.fetchone()
-
-        if from_gold_data is None or to_gold_data is None:
-            raise ValueError("One of the selected characters does not exist.")
+        # Deduct from the sender and credit the recipient in one statement.
+        # The sender's row only matches if it has enough gold, so anything but
+        # two updated rows means a missing character or insufficient funds.
+        transfer_cursor = execute_prepared(conn, SQL_TRANSFER_GOLD,
+                                           (from_id, amount, to_id, amount, from_id, to_id, from_id, amount))
 
-        from_gold = from_gold_data[0]
-        to_gold = to_gold_data[0]
+        if transfer_cursor.rowcount != 2:
+            raise ValueError("Insufficient gold to transfer, or one of the selected characters does not exist.")
 
-        if from_gold < amount:
-            raise ValueError("Insufficient gold to transfer!")
-
-        # 2. Deduct gold from sender
-        cursor.execute(f"UPDATE {TABLE_NAME} SET gold = gold - %s WHERE character_id = %s", (amount, from_id))
-        
-        # 3. Add gold to recipient
-        cursor.execute(f"UPDATE {TABLE_NAME} SET gold = gold + %s WHERE character_id = %s", (amount, to_id))
-        
         conn.commit()
+        fetch_all.clear()
         return True, "Gold transfer successful!"
     except Exception as e:
         conn.rollback()
         return False, f"Gold transfer failed: {e}"
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        conn.close() # Only the prepared cursor from execute_prepared() is used, and it stays cached
+
+
+# --- UI Callbacks ---
+# Mutations run as widget callbacks. Streamlit runs them before the rerun that the
+# click triggers, so that single rerun already renders the fresh data and no extra
+# st.rerun() is needed. Widget values are read back from st.session_state by key,
+# which also lets the Delete/Transfer buttons sit outside the input fragments below.
+
+def handle_add():
+    new_data = {col_name: st.session_state[f"add_{col_name}"] for col_name in COLUMNS}
+    if "creature_name" in new_data and not new_data["creature_name"]:
+        st.error("Character Name cannot be empty.")
+    else:
+        insert_row(new_data)
+
+def handle_update(id_val):
+    updated_data = {col_name: st.session_state[f"update_{col_name}"] for col_name in COLUMNS}
+    if "creature_name" in updated_data and not updated_data["creature_name"]:
+        st.error("Character Name cannot be empty.")
+    else:
+        update_row(id_val, updated_data)
+
+def handle_delete():
+    if delete_row(st.session_state["delete_select_box"]):
+        st.warning("Record deleted.")
+
+def handle_transfer():
+    from_id = st.session_state["from_char_select"]
+    to_id = st.session_state["to_char_select"]
+    amount = st.session_state["transfer_amount"]
+    if from_id == to_id:
+        st.error("Cannot transfer gold to the same character!")
+    elif from_id and to_id and amount:
+        success, msg = transfer_gold(from_id, to_id, amount)
+        if success:
+            st.success(msg)
+        else:
+            st.error(msg)
+    else:
+        st.warning("Please select both characters and a valid amount.")
+
+
+# --- UI Fragments ---
+# Input-only sections run as st.fragment, so picking a record or typing a transfer
+# amount reruns just that section rather than the whole script. The buttons that
+# mutate data stay outside the fragments: a fragment-only rerun after a write would
+# leave the records table and the other sections stale.
+
+@st.fragment
+def delete_picker(display_maps):
+    st.selectbox("Select ID to delete", display_maps["row_ids"], format_func=display_maps["id_to_display_name"].get, key="delete_select_box")
+
+@st.fragment
+def transfer_inputs(display_maps):
+    """Renders the From/To/Amount inputs; returns False if no transfer is possible."""
+    # id-to-name/gold mappings, memoized alongside the selectbox labels
+    id_name_map = display_maps["id_name_map"]
+    id_gold_map = display_maps["id_gold_map"]
+
+    def format_character(id_val):
+        return f"{id_name_map[id_val]} (ID {id_val})"
+
+    from_id = st.selectbox("From (Character)", list(id_name_map), format_func=format_character, key="from_char_select")
+    to_id_options = [id_val for id_val in id_name_map if id_val != from_id]
+
+    if not to_id_options:
+        st.warning("Please select a different 'From' character to enable 'To' selection.")
+        st.selectbox("To (Character)", ["N/A"], disabled=True, key="to_char_select_disabled_2")
+        st.number_input("Amount of Gold to Transfer", min_value=1, step=1, disabled=True, key="transfer_amount_disabled_2")
+        st.button("Transfer Gold", disabled=True, key="transfer_gold_disabled_2")
+        return False
+
+    to_id = st.selectbox("To (Character)", to_id_options, format_func=format_character, key="to_char_select")
+
+    if from_id and to_id: # Ensure both IDs are valid before displaying info
+        st.markdown(f"**{id_name_map[from_id]}'s current gold:** {id_gold_map[from_id]} GP")
+        st.markdown(f"**{id_name_map[to_id]}'s current gold:** {id_gold_map[to_id]} GP")
+
+    st.number_input(
+        "Amount of Gold to Transfer",
+        min_value=1,
+        step=1,
+        key="transfer_amount"
+    )
+    return True
 
 
 # --- Streamlit UI ---
@@ -294,75 +457,54 @@ st.set_page_config(layout="wide")
 st.title(f"D&D Character Management App")
 st.markdown(f"*(Generic CRUD operations for the **'{TABLE_NAME}'** table)*")
 
-rows = fetch_all()
+rows_df = load_rows()
 st.subheader("Existing Records")
-if not rows:
+if rows_df.empty:
     st.warning("No records found. Please add some records first.")
 else:
-    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    st.dataframe(rows_df, use_container_width=True)
 
 st.subheader("Add New Record")
 with st.form("add_form"):
-    new_data = {}
     for col_name, col_type in COLUMNS.items():
         if col_type == "TEXT":
-            new_data[col_name] = st.text_input(f"{col_name.replace('_', ' ').title()}")
+            st.text_input(f"{col_name.replace('_', ' ').title()}", key=f"add_{col_name}")
         elif col_type == "INTEGER": # For gold
-            new_data[col_name] = st.number_input(f"{col_name.replace('_', ' ').title()}", min_value=0, value=100, step=1)
+            st.number_input(f"{col_name.replace('_', ' ').title()}", min_value=0, value=100, step=1, key=f"add_{col_name}")
         else: # Fallback for any other type
-            new_data[col_name] = st.text_input(f"{col_name.replace('_', ' ').title()}")
+            st.text_input(f"{col_name.replace('_', ' ').title()}", key=f"add_{col_name}")
 
-    submitted = st.form_submit_button("Add")
-    if submitted:
-        if "creature_name" in new_data and not new_data["creature_name"]:
-            st.error("Character Name cannot be empty.")
-        else:
-            insert_row(new_data)
-            st.rerun() # Refresh data after adding
+    st.form_submit_button("Add", on_click=handle_add)
 
-if rows:
+if not rows_df.empty:
     st.subheader("Update Existing Record")
-    # Assuming 'id' is present in the fetched rows
-    row_ids = [row['id'] for row in rows]
-    
-    # Create display names for selectbox
-    id_to_display_name = {row['id']: row.get('creature_name', f"ID: {row['id']}") for row in rows}
-    display_options = [f"{id_to_display_name[id_val]} (ID: {id_val})" for id_val in row_ids]
-
-    selected_display_name = st.selectbox("Select ID to update", display_options)
-    selected_id = int(selected_display_name.split('(ID: ')[1][:-1]) # Extract ID from display string
-    selected_row = next((row for row in rows if row['id'] == selected_id), None)
-
-    if selected_row:
+    display_maps = build_display_maps(rows_df)
+    # The selectboxes return the ID itself; format_func only renders the label
+    row_ids = display_maps["row_ids"]
+    id_to_display_name = display_maps["id_to_display_name"]
+    rows_by_id = display_maps["rows_by_id"]
+
+    selected_id = st.selectbox("Select ID to update", row_ids, format_func=id_to_display_name.get)
+    selected_row = rows_by_id.loc[selected_id] if selected_id in rows_by_id.index else None
+
+    if selected_row is not None:
         with st.form("update_form"):
-            updated_data = {}
             for col_name, col_type in COLUMNS.items():
                 current_value = selected_row.get(col_name)
                 if col_type == "TEXT":
-                    updated_data[col_name] = st.text_input(f"{col_name.replace('_', ' ').title()}", value=str(current_value if current_value is not None else ""), key=f"update_{col_name}")
+                    st.text_input(f"{col_name.replace('_', ' ').title()}", value=str(current_value if current_value is not None else ""), key=f"update_{col_name}")
                 elif col_type == "INTEGER":
-                    updated_data[col_name] = st.number_input(f"{col_name.replace('_', ' ').title()}", min_value=0, value=int(current_value if current_value is not None else 0), step=1, key=f"update_{col_name}")
+                    st.number_input(f"{col_name.replace('_', ' ').title()}", min_value=0, value=int(current_value if current_value is not None else 0), step=1, key=f"update_{col_name}")
                 else:
-                    updated_data[col_name] = st.text_input(f"{col_name.replace('_', ' ').title()}", value=str(current_value if current_value is not None else ""), key=f"update_{col_name}")
-            
-            updated = st.form_submit_button("Update")
-            if updated:
-                if "creature_name" in updated_data and not updated_data["creature_name"]:
-                    st.error("Character Name cannot be empty.")
-                else:
-                    update_row(selected_id, updated_data)
-                    st.rerun() # Refresh data after update
+                    st.text_input(f"{col_name.replace('_', ' ').title()}", value=str(current_value if current_value is not None else ""), key=f"update_{col_name}")
 
-    st.subheader("Delete Record")
-    delete_display_name = st.selectbox("Select ID to delete", display_options, key="delete_select_box")
-    delete_id = int(delete_display_name.split('(ID: ')[1][:-1]) # Extract ID from display string
+            st.form_submit_button("Update", on_click=handle_update, args=(selected_id,))
 
-    if st.button("Delete"):
-        delete_row(delete_id)
-        st.warning("Record deleted.")
-        st.rerun() # Refresh data after deletion
+    st.subheader("Delete Record")
+    delete_picker(display_maps)
+    st.button("Delete", on_click=handle_delete)
 
-if not rows or len(rows) < 2:
+if len(rows_df) < 2:
     st.warning("Not enough characters to perform a gold transfer. Please add at least 2 characters.")
     # Disable transfer section if not enough characters
     st.subheader("Transfer Gold Between Characters (Transactional)")
@@ -373,46 +515,5 @@ if not rows or len(rows) < 2:
 else:
     st.subheader("Transfer Gold Between Characters (Transactional)")
 
-    # Create name-to-id and id-to-name/gold mappings
-    name_id_map = {f"{row['creature_name']} (ID {row['id']})": row['id'] for row in rows}
-    id_name_map = {row['id']: row['creature_name'] for row in rows}
-    id_gold_map = {row['id']: row['gold'] for row in rows}
-
-    from_name_display = st.selectbox("From (Character)", list(name_id_map.keys()), key="from_char_select")
-    to_name_options_display = [n for n in name_id_map.keys() if n != from_name_display]
-
-    if not to_name_options_display:
-        st.warning("Please select a different 'From' character to enable 'To' selection.")
-        st.selectbox("To (Character)", ["N/A"], disabled=True, key="to_char_select_disabled_2")
-        st.number_input("Amount of Gold to Transfer", min_value=1, step=1, disabled=True, key="transfer_amount_disabled_2")
-        st.button("Transfer Gold", disabled=True, key="transfer_gold_disabled_2")
-    else:
-        to_name_display = st.selectbox("To (Character)", to_name_options_display, key="to_char_select")
-
-        from_id = name_id_map.get(from_name_display)
-        to_id = name_id_map.get(to_name_display)
-
-        if from_id and to_id: # Ensure both IDs are valid before displaying info
-            st.markdown(f"**{id_name_map[from_id]}'s current gold:** {id_gold_map[from_id]} GP")
-            st.markdown(f"**{id_name_map[to_id]}'s current gold:** {id_gold_map[to_id]} GP")
-
-        amount = st.number_input(
-            "Amount of Gold to Transfer",
-            min_value=1,
-            step=1,
-            key="transfer_amount"
-        )
-
-        if st.button("Transfer Gold"):
-            if from_id == to_id:
-                st.error("Cannot transfer gold to the same character!")
-            elif from_id and to_id and amount:
-                success, msg = transfer_gold(from_id, to_id, amount)
-                if success:
-                    st.success(msg)
-                else:
-                    st.error(msg)
-                st.rerun() # Refresh to show updated gold values
-            else:
-                st.warning("Please select both characters and a valid amount.")
-
+    if transfer_inputs(display_maps):
+        st.button("Transfer Gold", on_click=handle_transfer)
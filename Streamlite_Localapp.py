@@ -1,70 +1,206 @@
 import streamlit as st
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 import pandas as pd # Needed for st.dataframe
+import warnings
 # Import TABLE_NAME and COLUMNS from your local config.py
 from config import TABLE_NAME, COLUMNS
 
+# --- Required Indexes ---
+# SQL_FETCH_ALL filters on creature_type and orders by creature_name, so it needs
+#   CREATE INDEX ix_creatures_type_name ON Creatures (creature_type, creature_name);
+# to read in index order instead of filesorting. The join side, Characters.character_id,
+# is that table's primary key. The upserts also rely on UNIQUE (creature_name) on Creatures.
+# Both are created by schema_updates.sql.
+
+# --- SQL Statements ---
+# Built once at import time; TABLE_NAME never changes while the app runs, and
+# identical strings let execute_prepared() reuse its prepared statements.
+if TABLE_NAME == "Characters":
+    # For Characters, we need to join with Creatures to get the creature_name
+    # and use creature_id as the primary key for display/selection.
+    SQL_FETCH_ALL = f"""
+        SELECT
+            C.creature_id AS id,
+            C.creature_name AS creature_name,
+            T.gold AS gold
+        FROM
+            Creatures AS C
+        JOIN
+            {TABLE_NAME} AS T ON C.creature_id = T.character_id
+        WHERE
+            C.creature_type = 'Character'
+        ORDER BY C.creature_name
+    """
+else:
+    # Generic fetch for other tables if TABLE_NAME changes
+    # Assumes 'id' as primary key for simplicity if not 'Characters'
+    # You would need to ensure the table has an 'id' column or adjust
+    SQL_FETCH_ALL = f"SELECT * FROM {TABLE_NAME} ORDER BY id"
+
+SQL_UPSERT_CREATURE = """
+    INSERT INTO Creatures (creature_type, creature_name, hit_points, armor_class, speed, size, level, is_homebrew)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE creature_id = LAST_INSERT_ID(creature_id)
+"""
+SQL_UPSERT_CREATURES_BULK = """
+    INSERT INTO Creatures (creature_type, creature_name, hit_points, armor_class, speed, size, level, is_homebrew)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE creature_id = creature_id
+"""
+SQL_UPSERT_CHARACTER = f"""
+    INSERT INTO {TABLE_NAME} (character_id, race_id, class_id, gold)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE gold = VALUES(gold)
+"""
+SQL_UPDATE_CREATURE_NAME = "UPDATE Creatures SET creature_name = %s WHERE creature_id = %s"
+SQL_UPDATE_GOLD = f"UPDATE {TABLE_NAME} SET gold = %s WHERE character_id = %s"
+SQL_DELETE_CREATURE = "DELETE FROM Creatures WHERE creature_id = %s"
+# Deduct and add in one statement. The sender row only matches if it has enough gold,
+# so a short balance or a missing character shows up as fewer than 2 rows changed.
+SQL_TRANSFER_GOLD = f"""
+    UPDATE {TABLE_NAME}
+    SET gold = CASE character_id WHEN %s THEN gold - %s WHEN %s THEN gold + %s END
+    WHERE character_id IN (%s, %s) AND (character_id <> %s OR gold >= %s)
+"""
+
 @st.cache_resource
-def get_connection():
-    """Establishes and returns a database connection.
-    Uses st.cache_resource to cache the connection for performance."""
+def get_pool():
+    """Creates and returns a MySQL connection pool shared by every session.
+    Uses st.cache_resource so the pool is built once, not on every rerun."""
     try:
         # IMPORTANT: Replace these with your ACTUAL MySQL database credentials
-        conn = mysql.connector.connect(
+        return pooling.MySQLConnectionPool(
+            pool_name="dnd_local",
+            pool_size=10,              # Enough for several concurrent sessions without queuing
+            pool_reset_session=False,  # Skip the COM_RESET_CONNECTION round-trip on checkout
+            autocommit=True,           # Reads must not leave an open snapshot on a pooled connection
             host="localhost",          # e.g., 'localhost' or '127.0.0.1'
             port=3306,                 # Default MySQL port
             user="root",               # Your MySQL username
             password="",               # Your MySQL password (use '' if no password)
             database="dnd_database"    # The name of your D&D database
         )
-        return conn
     except mysql.connector.Error as e:
         st.error(f"Error connecting to MySQL: {e}")
         st.stop() # Stop the app if connection fails
         return None
 
+def get_connection():
+    """Borrows a connection from the pool.
+    Calling close() on it hands it back to the pool instead of disconnecting."""
+    try:
+        return get_pool().get_connection()
+    except mysql.connector.Error as e:
+        st.error(f"Error connecting to MySQL: {e}")
+        st.stop() # Stop the app if connection fails
+        return None
+
+def release(conn, cursor):
+    """Closes cursor and hands conn back to the pool (close() on a pooled connection
+    returns it rather than disconnecting). The connection is returned even if
+    closing the cursor fails."""
+    try:
+        cursor.close()
+    finally:
+        conn.close()
+
+def execute_prepared(conn, sql, params):
+    """Executes sql as a server-side prepared statement and returns its cursor.
+    The statement is prepared once per pooled connection and reused afterwards, which
+    saves the server from parsing it again. The trade-off: mysql.connector sends a
+    COM_STMT_RESET and waits for its reply before every COM_STMT_EXECUTE, so each
+    reused call costs two round-trips where a plain cursor.execute() costs one.
+    The cursors are stored on the pool's underlying connection object, so they live and
+    die with it, and are dropped when a reconnect gives that connection a new
+    connection_id (old handles are gone). sql must be a module-level constant: the
+    prepared cursor only reuses a statement when handed the identical string object."""
+    cnx = getattr(conn, "_cnx", conn) # PooledMySQLConnection wraps the real connection
+    prepared = getattr(cnx, "_prepared_cursors", None)
+    if prepared is None or prepared[0] != cnx.connection_id:
+        prepared = (cnx.connection_id, {})
+        cnx._prepared_cursors = prepared
+    cursor = prepared[1].get(sql)
+    if cursor is None:
+        cursor = conn.cursor(prepared=True)
+        prepared[1][sql] = cursor
+    cursor.execute(sql, params)
+    return cursor
+
+@st.cache_resource
+def get_default_ids(_cursor):
+    """Returns the (race_id, class_id) given to newly added characters.
+    Both are read with one query the first time and then cached for every session,
+    since they never change. The leading underscore keeps the cursor out of the cache key."""
+    _cursor.execute("""
+        SELECT
+            (SELECT race_id FROM Races WHERE race_name = 'Human' LIMIT 1),
+            (SELECT class_id FROM Classes WHERE class_name = 'Fighter' LIMIT 1)
+    """)
+    race_id, class_id = _cursor.fetchone()
+    return (race_id if race_id is not None else 1, class_id if class_id is not None else 1)
+
 # --- Generic CRUD Functions (adapted for MySQL and TARGET_TABLE_NAME from config) ---
 
-def fetch_all_records(): # Renamed from fetch_all to be more specific
-    """Fetches all rows from the TABLE_NAME defined in config.py.
-    Specifically adapted for 'Characters' table to join with 'Creatures' for name."""
+def clear_record_caches():
+    """Drops the cached reads so every tab sees the change after a write."""
+    fetch_all_df.clear()
+
+@st.cache_data(ttl=30, show_spinner=False) # Shared by all five tabs; cleared on every write
+def fetch_all_df():
+    """Fetches all rows from the TABLE_NAME defined in config.py straight into a DataFrame.
+    Specifically adapted for 'Characters' table to join with 'Creatures' for name.
+    pd.read_sql builds the columns in bulk instead of going through a list of per-row dicts.
+    Errors are raised, not returned, so st.cache_data never caches a failed read."""
     conn = get_connection()
     if conn is None:
-        return []
-    cursor = conn.cursor(dictionary=True) # Returns rows as dictionaries
+        return pd.DataFrame()
     try:
-        if TABLE_NAME == "Characters":
-            # For Characters, we need to join with Creatures to get the creature_name
-            # and use creature_id as the primary key for display/selection.
-            cursor.execute(f"""
-                SELECT
-                    C.creature_id AS id,
-                    C.creature_name AS creature_name,
-                    T.gold AS gold
-                FROM
-                    Creatures AS C
-                JOIN
-                    {TABLE_NAME} AS T ON C.creature_id = T.character_id
-                WHERE
-                    C.creature_type = 'Character'
-                ORDER BY C.creature_name
-            """)
-        else:
-            # Generic fetch for other tables if TABLE_NAME changes
-            # Assumes 'id' as primary key for simplicity if not 'Characters'
-            # You would need to ensure the table has an 'id' column or adjust
-            cursor.execute(f"SELECT * FROM {TABLE_NAME} ORDER BY id")
-        
-        rows = cursor.fetchall()
-        return rows
-    except Error as e:
-        st.error(f"Error fetching data from {TABLE_NAME}: {e}")
-        return []
+        with warnings.catch_warnings():
+            # pandas warns about plain DBAPI connections, but mysql.connector works with read_sql
+            warnings.simplefilter("ignore", UserWarning)
+            return pd.read_sql(SQL_FETCH_ALL, conn)
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        conn.close()
+
+def load_records():
+    """Returns the records for this rerun, or an empty frame after reporting a read error."""
+    try:
+        return fetch_all_df()
+    except (Error, pd.errors.DatabaseError) as e: # read_sql wraps driver errors in DatabaseError
+        st.error(f"Error fetching data from {TABLE_NAME}: {e}")
+        return pd.DataFrame()
+
+def build_record_maps(rows_df):
+    """Builds the selectbox options and id lookups used by tabs 3-5 from the columns of rows_df.
+    Memoized in st.session_state on a hash of the frame's contents, so reruns caused
+    only by widget changes (e.g. typing a transfer amount) reuse the previous maps."""
+    fingerprint = (len(rows_df), int(pd.util.hash_pandas_object(rows_df, index=False).sum()))
+    cached = st.session_state.get("record_maps")
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    if rows_df.empty:
+        return {'row_options': {}, 'rows_by_id': rows_df} # Nothing to select (or the read failed)
+
+    # Vectorized string ops build every label at once instead of looping over rows
+    ids = rows_df['id'].astype(str)
+    if 'creature_name' in rows_df:
+        display_names = rows_df['creature_name'].astype(str)
+    else:
+        display_names = "ID: " + ids # Use creature_name if available, else ID
+    rows_by_id = rows_df.set_index('id')
+    # tolist()/to_dict() yield plain Python values, which mysql.connector can bind as parameters
+    row_ids = rows_df['id'].tolist()
+    maps = {
+        'row_options': dict(zip((display_names + " (ID: " + ids + ")").tolist(), row_ids)),
+        'rows_by_id': rows_by_id, # Kept columnar; the Update form reads one row with .loc
+    }
+    if TABLE_NAME == "Characters":
+        maps['id_label'] = dict(zip(row_ids, (display_names + " (ID " + ids + ")").tolist()))
+        maps['id_name'] = rows_by_id['creature_name'].to_dict()
+        maps['id_gold'] = rows_by_id['gold'].to_dict()
+    st.session_state["record_maps"] = (fingerprint, maps)
+    return maps
 
 def insert_row_record(data): # Renamed from insert_row
     """Inserts a new row into the TABLE_NAME defined in config.py.
@@ -84,35 +220,21 @@ def insert_row_record(data): # Renamed from insert_row
             if not creature_name:
                 raise ValueError("Character Name is required.")
 
-            # Check if creature_name already exists to avoid duplicates
-            cursor.execute("SELECT creature_id FROM Creatures WHERE creature_name = %s LIMIT 1", (creature_name,))
-            existing_creature = cursor.fetchone()
+            # For simplicity, we'll use default race/class IDs. You might want to add select boxes for these.
+            default_race_id, default_class_id = get_default_ids(cursor)
 
-            if existing_creature:
+            # Insert into Creatures, or reuse the existing creature_id if the name is taken.
+            # LAST_INSERT_ID(creature_id) makes lastrowid correct on both paths (needs UNIQUE creature_name).
+            cursor.execute(SQL_UPSERT_CREATURE, ('Character', creature_name, 50, 10, 30, 'Medium', 1, False))
+            creature_id = cursor.lastrowid
+            if cursor.rowcount != 1: # 1 = new row inserted, 0 = name already existed
                 st.warning(f"Character '{creature_name}' already exists. Updating existing character's gold.")
-                creature_id = existing_creature[0]
-                cursor.execute(f"UPDATE {TABLE_NAME} SET gold = %s WHERE character_id = %s", (gold, creature_id))
-            else:
-                # Insert into Creatures
-                cursor.execute("""
-                    INSERT INTO Creatures (creature_type, creature_name, hit_points, armor_class, speed, size, level, is_homebrew)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """, ('Character', creature_name, 50, 10, 30, 'Medium', 1, False))
-                creature_id = cursor.lastrowid # Get the ID of the newly inserted creature
-
-                # 2. Insert into Characters table using the new creature_id
-                # For simplicity, we'll use default race/class IDs. You might want to add select boxes for these.
-                cursor.execute("SELECT race_id FROM Races WHERE race_name = 'Human' LIMIT 1")
-                default_race_id = cursor.fetchone()[0] if cursor.rowcount > 0 else 1
-                cursor.execute("SELECT class_id FROM Classes WHERE class_name = 'Fighter' LIMIT 1")
-                default_class_id = cursor.fetchone()[0] if cursor.rowcount > 0 else 1
-
-                cursor.execute(f"""
-                    INSERT INTO {TABLE_NAME} (character_id, race_id, class_id, gold)
-                    VALUES (%s, %s, %s, %s)
-                """, (creature_id, default_race_id, default_class_id, gold))
-            
+
+            # 2. Insert into Characters table using the creature_id, or update gold if it is already there
+            cursor.execute(SQL_UPSERT_CHARACTER, (creature_id, default_race_id, default_class_id, gold))
+
             conn.commit()
+            clear_record_caches()
             st.success(f"Character '{creature_name}' added/updated successfully!")
 
         else:
@@ -122,6 +244,7 @@ def insert_row_record(data): # Renamed from insert_row
             query = f"INSERT INTO {TABLE_NAME} ({columns}) VALUES ({placeholders})"
             cursor.execute(query, tuple(data.values()))
             conn.commit()
+            clear_record_caches()
             st.success(f"Record added to {TABLE_NAME} successfully!")
         
         return True
@@ -134,13 +257,85 @@ def insert_row_record(data): # Renamed from insert_row
         conn.rollback()
         return False
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        release(conn, cursor)
+
+def insert_rows_bulk(rows):
+    """Inserts many rows (a list of dicts keyed like COLUMNS) in one transaction.
+    Uses cursor.executemany, which mysql.connector rewrites into a single multi-row
+    INSERT ... VALUES (...), (...), so the cost no longer grows with one round-trip per row."""
+    if not rows:
+        return 0
+    conn = get_connection()
+    if conn is None:
+        return 0
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction() # All rows are imported, or none
+
+        if TABLE_NAME == "Characters":
+            names = [row.get("creature_name") for row in rows]
+            # pandas reads a blank cell as NaN, which is truthy, so check for it explicitly
+            if any(pd.isna(name) or not str(name).strip() for name in names):
+                raise ValueError("Every row needs a creature_name.")
+            # creature_name compares case-insensitively and ignores trailing spaces in MySQL,
+            # so rows are keyed the same way: 'alice' and 'Alice ' are one character
+            gold_by_key = {}
+            for row in rows:
+                name = str(row["creature_name"]).strip()
+                gold_by_key[name.casefold()] = (name, row.get("gold", 0))
+            gold_by_name = dict(gold_by_key.values())
+
+            # 1. Upsert all Creatures rows with one multi-row statement
+            cursor.executemany(SQL_UPSERT_CREATURES_BULK, [('Character', name, 50, 10, 30, 'Medium', 1, False) for name in gold_by_name])
+
+            # 2. Resolve every creature_id (new or existing) in one SELECT
+            placeholders = ', '.join(['%s'] * len(gold_by_name))
+            cursor.execute(f"SELECT creature_id, creature_name FROM Creatures WHERE creature_name IN ({placeholders})",
+                           tuple(gold_by_name))
+            # MySQL returns the stored spelling (e.g. 'Alice' for a CSV 'alice'), so match on the same key
+            id_by_key = {name.strip().casefold(): creature_id for creature_id, name in cursor.fetchall()}
+            unmatched = [name for key, (name, _) in gold_by_key.items() if key not in id_by_key]
+            if unmatched:
+                raise ValueError(f"Could not match these names to a Creatures row: {', '.join(unmatched)}")
+
+            # 3. Upsert all Characters rows with one multi-row statement
+            default_race_id, default_class_id = get_default_ids(cursor)
+            cursor.executemany(SQL_UPSERT_CHARACTER, [(id_by_key[key], default_race_id, default_class_id, gold)
+                                                      for key, (_, gold) in gold_by_key.items()])
+            imported = len(gold_by_name)
+        else:
+            # Generic multi-row insert for other tables (assuming simple structure)
+            columns = list(rows[0].keys())
+            placeholders = ', '.join(['%s'] * len(columns))
+            query = f"INSERT INTO {TABLE_NAME} ({', '.join(columns)}) VALUES ({placeholders})"
+            cursor.executemany(query, [tuple(row[col] for col in columns) for row in rows])
+            imported = len(rows)
 
-def update_row_record(id_val, data): # Renamed from update_row
+        conn.commit()
+        clear_record_caches()
+        st.success(f"Imported {imported} record(s) into {TABLE_NAME} successfully!")
+        return imported
+    except Error as e:
+        st.error(f"Error bulk inserting data into {TABLE_NAME}: {e}")
+        conn.rollback()
+        return 0
+    except ValueError as e:
+        st.error(f"Validation Error: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        release(conn, cursor)
+
+def update_row_record(id_val, data, original=None): # Renamed from update_row
     """Updates an existing row in the TABLE_NAME based on its primary key.
-    Special handling for 'Characters' as it involves 'Creatures' table."""
+    Special handling for 'Characters' as it involves 'Creatures' table.
+    If original (the row as the form showed it) is given, only changed values are written."""
+    if original is not None:
+        data = {col: value for col, value in data.items() if value != original.get(col)}
+        if not data:
+            st.info(f"No changes to save for ID {id_val}.")
+            return True
+
     conn = get_connection()
     if conn is None:
         return False
@@ -149,17 +344,18 @@ def update_row_record(id_val, data): # Renamed from update_row
         conn.start_transaction() # Start transaction for multi-table update
 
         if TABLE_NAME == "Characters":
-            # Update creature_name in Creatures table
+            # Update creature_name in Creatures table (skipped when unchanged)
             creature_name = data.get("creature_name")
             if creature_name:
-                cursor.execute("UPDATE Creatures SET creature_name = %s WHERE creature_id = %s", (creature_name, id_val))
+                execute_prepared(conn, SQL_UPDATE_CREATURE_NAME, (creature_name, id_val))
             
-            # Update gold in Characters table
+            # Update gold in Characters table (skipped when unchanged)
             gold = data.get("gold")
             if gold is not None:
-                cursor.execute(f"UPDATE {TABLE_NAME} SET gold = %s WHERE character_id = %s", (gold, id_val))
+                execute_prepared(conn, SQL_UPDATE_GOLD, (gold, id_val))
             
             conn.commit()
+            clear_record_caches()
             st.success(f"Character (ID: {id_val}) updated successfully!")
         else:
             # Generic update for other tables (assuming 'id' as primary key)
@@ -167,6 +363,7 @@ def update_row_record(id_val, data): # Renamed from update_row
             query = f"UPDATE {TABLE_NAME} SET {set_clause} WHERE id = %s"
             cursor.execute(query, tuple(data.values()) + (id_val,))
             conn.commit()
+            clear_record_caches()
             if cursor.rowcount > 0:
                 st.success(f"Record (ID: {id_val}) in {TABLE_NAME} updated successfully!")
             else:
@@ -177,9 +374,7 @@ def update_row_record(id_val, data): # Renamed from update_row
         conn.rollback()
         return False
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        release(conn, cursor)
 
 def delete_row_record(id_val): # Renamed from delete_row
     """Deletes a row from the TABLE_NAME based on its primary key.
@@ -187,30 +382,21 @@ def delete_row_record(id_val): # Renamed from delete_row
     conn = get_connection()
     if conn is None:
         return False
-    cursor = conn.cursor()
+    cursor = None # Only the generic branch needs a plain cursor
     try:
-        conn.start_transaction() # Start transaction for multi-table deletion
-
+        # Each branch issues a single statement, which autocommit commits on its own
         if TABLE_NAME == "Characters":
-            # Delete from Character_Classes, Character_Spells, Character_Combats, Inventory first
-            cursor.execute("DELETE FROM Character_Classes WHERE character_id = %s", (id_val,))
-            cursor.execute("DELETE FROM Character_Spells WHERE character_id = %s", (id_val,))
-            cursor.execute("DELETE FROM Character_Combats WHERE creature_id = %s", (id_val,)) # creature_id in Character_Combats
-            cursor.execute("DELETE FROM Inventory WHERE creature_id = %s", (id_val,)) # creature_id in Inventory
-
-            # Then delete from Characters table
-            cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE character_id = %s", (id_val,))
-            
-            # Finally, delete from Creatures table
-            cursor.execute("DELETE FROM Creatures WHERE creature_id = %s", (id_val,))
-            
-            conn.commit()
+            # Character_Classes, Character_Spells, Character_Combats, Inventory and Characters
+            # rows go with it via their ON DELETE CASCADE foreign keys (see schema_cascade_fks.sql)
+            execute_prepared(conn, SQL_DELETE_CREATURE, (id_val,))
+            clear_record_caches()
             st.success(f"Character (ID: {id_val}) and associated data deleted successfully!")
         else:
             # Generic delete for other tables (assuming 'id' as primary key)
             query = f"DELETE FROM {TABLE_NAME} WHERE id = %s"
+            cursor = conn.cursor()
             cursor.execute(query, (id_val,))
-            conn.commit()
+            clear_record_caches()
             if cursor.rowcount > 0:
                 st.success(f"Record (ID: {id_val}) deleted from {TABLE_NAME} successfully!")
             else:
@@ -218,12 +404,12 @@ def delete_row_record(id_val): # Renamed from delete_row
         return True
     except Error as e:
         st.error(f"Error deleting data from {TABLE_NAME}: {e}")
-        conn.rollback()
         return False
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
+        if cursor is None:
             conn.close()
+        else:
+            release(conn, cursor)
 
 # --- Transaction: Transfer Gold Between Characters (adapted from your transfer_age) ---
 
@@ -236,40 +422,136 @@ def transfer_gold(from_id, to_id, amount): # Renamed from transfer_age
     if conn is None:
         return False, "Database connection failed."
 
-    cursor = conn.cursor()
     try:
         conn.start_transaction()
 
-        # 1. Get current gold for both characters
-        cursor.execute(f"SELECT gold FROM {TABLE_NAME} WHERE character_id = %s FOR UPDATE", (from_id,))
-        from_gold_data = cursor.fetchone()
-        cursor.execute(f"SELECT gold FROM {TABLE_NAME} WHERE character_id = %s FOR UPDATE", (to_id,))
-        to_gold_data = cursor.fetchone()
+        transfer_cursor = execute_prepared(conn, SQL_TRANSFER_GOLD,
+                                           (from_id, amount, to_id, amount, from_id, to_id, from_id, amount))
+        if transfer_cursor.rowcount != 2:
+            raise ValueError("Insufficient gold, or one of the selected characters does not exist.")
 
-        if from_gold_data is None or to_gold_data is None:
-            raise ValueError("One of the selected characters does not exist.")
-
-        from_gold = from_gold_data[0]
-        to_gold = to_gold_data[0]
-
-        if from_gold < amount:
-            raise ValueError("Insufficient gold to transfer.")
-
-        # 2. Deduct gold from sender
-        cursor.execute(f"UPDATE {TABLE_NAME} SET gold = gold - %s WHERE character_id = %s", (amount, from_id))
-        
-        # 3. Add gold to recipient
-        cursor.execute(f"UPDATE {TABLE_NAME} SET gold = gold + %s WHERE character_id = %s", (amount, to_id))
-        
         conn.commit()
+        clear_record_caches()
         return True, "Gold transfer successful!"
     except Exception as e:
         conn.rollback()
         return False, f"Gold transfer failed: {e}"
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        conn.close() # Only the prepared cursor from execute_prepared() is used, and it stays cached
+
+
+# --- UI Callbacks ---
+# Mutations run as widget callbacks. Streamlit runs them before the rerun that the
+# click triggers, so that single rerun already renders the fresh data in every tab and
+# no extra st.rerun() is needed. Widget values are read back from st.session_state by key,
+# which also lets the Delete/Transfer buttons sit outside the input fragments below.
+
+def handle_add():
+    new_data = {col_name: st.session_state[f"add_{col_name}"] for col_name in COLUMNS}
+    # Basic validation: ensure character name (or primary text field) is not empty
+    if "creature_name" in new_data and not new_data["creature_name"]:
+        st.error("Character Name cannot be empty.")
+    else:
+        insert_row_record(new_data)
+
+def handle_import():
+    try:
+        # Read names as text, so a column of numeric names is not parsed as int
+        import_df = pd.read_csv(st.session_state["bulk_import_csv"], dtype={"creature_name": str})
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
+        st.error(f"Could not read the CSV file: {e}")
+        return
+    missing_columns = [col for col in COLUMNS if col not in import_df.columns]
+    if missing_columns:
+        st.error(f"CSV is missing column(s): {', '.join(missing_columns)}")
+        return
+    # Blank cells come back as NaN; reject them here rather than sending NaN to MySQL
+    incomplete = import_df[list(COLUMNS)].isna().any(axis=1)
+    if "creature_name" in COLUMNS:
+        import_df["creature_name"] = import_df["creature_name"].str.strip()
+        incomplete |= import_df["creature_name"] == ""
+    if incomplete.any():
+        # +2: pandas counts from 0 and the header is line 1 of the file
+        line_numbers = ', '.join(str(i + 2) for i in import_df.index[incomplete])
+        st.error(f"CSV line(s) {line_numbers} have empty values. Fill them in and try again.")
+    else:
+        # to_dict('records') yields plain Python values, which mysql.connector can bind
+        insert_rows_bulk(import_df[list(COLUMNS)].to_dict('records'))
+
+def handle_update(id_val, original):
+    updated_data = {col_name: st.session_state[f"update_{col_name}"] for col_name in COLUMNS}
+    if "creature_name" in updated_data and not updated_data["creature_name"]:
+        st.error("Character Name cannot be empty.")
+    else:
+        # Pass the row the form was filled from so unchanged values are not rewritten
+        update_row_record(id_val, updated_data, original)
+
+def handle_delete(row_delete_options):
+    selected_id_to_delete_val = row_delete_options.get(st.session_state["delete_select"])
+    if selected_id_to_delete_val:
+        delete_row_record(selected_id_to_delete_val)
+
+def handle_transfer():
+    from_id = st.session_state["from_char_select"]
+    to_id = st.session_state["to_char_select"]
+    amount = st.session_state["transfer_amount"]
+    if from_id == to_id:
+        st.error("Cannot transfer gold to the same character!")
+    elif from_id and to_id and amount:
+        success, msg = transfer_gold(from_id, to_id, amount)
+        if success:
+            st.success(msg)
+        else:
+            st.error(msg)
+    else:
+        st.warning("Please select both characters and a valid amount.")
+
+
+# --- UI Fragments ---
+# Input-only sections run as st.fragment, so picking a record or typing a transfer
+# amount reruns just that section rather than every tab. The buttons that mutate data
+# stay outside the fragments: a fragment-only rerun after a write would leave the
+# other tabs showing stale data.
+
+@st.fragment
+def delete_picker(row_delete_options):
+    selected_id_to_delete_display = st.selectbox(f"Select Record to Delete from '{TABLE_NAME}'",
+                                                options=list(row_delete_options.keys()),
+                                                key="delete_select",
+                                                index=0 if row_delete_options else None)
+    st.warning(f"Are you sure you want to delete '{selected_id_to_delete_display}' and all its associated data?")
+
+@st.fragment
+def transfer_inputs(record_maps):
+    """Renders the From/To/Amount inputs; returns False if no transfer is possible."""
+    # The selectboxes return the ID itself; format_func only renders the "Name (ID X)" label
+    id_label_map = record_maps['id_label']
+    id_name_map = record_maps['id_name']
+    id_gold_map = record_maps['id_gold']
+
+    from_id = st.selectbox("From (Character)", list(id_label_map), format_func=id_label_map.get, key="from_char_select")
+    to_id_options = [id_val for id_val in id_label_map if id_val != from_id]
+
+    if not to_id_options:
+        st.warning("Please select a different 'From' character to enable 'To' selection.")
+        st.selectbox("To (Character)", ["N/A"], disabled=True, key="to_char_select_disabled_2")
+        st.number_input("Amount of Gold to Transfer", min_value=1, step=1, disabled=True, key="transfer_amount_disabled_2")
+        st.button("Transfer Gold", disabled=True, key="transfer_gold_disabled_2")
+        return False
+
+    to_id = st.selectbox("To (Character)", to_id_options, format_func=id_label_map.get, key="to_char_select")
+
+    if from_id and to_id: # Ensure both IDs are valid before displaying info
+        st.markdown(f"**{id_name_map[from_id]}'s current gold:** {id_gold_map[from_id]} GP")
+        st.markdown(f"**{id_name_map[to_id]}'s current gold:** {id_gold_map[to_id]} GP")
+
+    st.number_input(
+        "Amount of Gold to Transfer",
+        min_value=1,
+        step=1,
+        key="transfer_amount"
+    )
+    return True
 
 
 # --- Streamlit UI ---
@@ -280,12 +562,14 @@ st.markdown(f"*(Generic CRUD operations for the **'{TABLE_NAME}'** table)*")
 # Create tabs for different functionalities
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["View Records", "Add New Record", "Update Record", "Delete Record", "Transfer Gold (Transaction)"])
 
+# Read once per rerun; every tab renders from the same (cached) frame and lookups
+rows_df = load_records()
+record_maps = build_record_maps(rows_df)
+
 # --- Tab 1: View Records (Generic) ---
 with tab1:
     st.header(f"All {TABLE_NAME} Records")
-    rows = fetch_all_records()
-    if rows:
-        rows_df = pd.DataFrame(rows)
+    if not rows_df.empty:
         st.dataframe(rows_df, use_container_width=True)
     else:
         st.info(f"No records found in the '{TABLE_NAME}' table. Please add some records.")
@@ -294,36 +578,29 @@ with tab1:
 with tab2:
     st.header(f"Add New Record to '{TABLE_NAME}'")
     with st.form("add_form"):
-        new_data = {}
         for col_name, col_type in COLUMNS.items():
             # Use appropriate Streamlit widget based on defined column type
             if col_type == "TEXT":
-                new_data[col_name] = st.text_input(f"{col_name.replace('_', ' ').title()}")
+                st.text_input(f"{col_name.replace('_', ' ').title()}", key=f"add_{col_name}")
             elif col_type == "INTEGER": # For gold
-                new_data[col_name] = st.number_input(f"{col_name.replace('_', ' ').title()}", min_value=0, value=100, step=1)
+                st.number_input(f"{col_name.replace('_', ' ').title()}", min_value=0, value=100, step=1, key=f"add_{col_name}")
             else: # Fallback for any other type
-                new_data[col_name] = st.text_input(f"{col_name.replace('_', ' ').title()}")
+                st.text_input(f"{col_name.replace('_', ' ').title()}", key=f"add_{col_name}")
 
-        submitted = st.form_submit_button("Add")
-        if submitted:
-            # Basic validation: ensure character name (or primary text field) is not empty
-            if "creature_name" in new_data and not new_data["creature_name"]:
-                st.error("Character Name cannot be empty.")
-            else:
-                insert_row_record(new_data)
-                st.rerun() # Refresh data after adding
+        st.form_submit_button("Add", on_click=handle_add)
+
+    st.subheader("Bulk Import CSV")
+    st.caption(f"The CSV needs a header row with these columns: {', '.join(COLUMNS)}")
+    uploaded_csv = st.file_uploader("CSV file", type="csv", key="bulk_import_csv")
+    if uploaded_csv is not None:
+        st.button("Import CSV", on_click=handle_import)
 
 # --- Tab 3: Update Record (Generic) ---
 with tab3:
     st.header(f"Update Existing Record in '{TABLE_NAME}'")
-    rows_for_select = fetch_all_records()
-    
-    # Create options for selectbox: "Character Name (ID: X)"
-    # Assuming 'id' is the primary key returned by fetch_all_records
-    row_options = {}
-    for row in rows_for_select:
-        display_name = row.get("creature_name", f"ID: {row['id']}") # Use creature_name if available, else ID
-        row_options[f"{display_name} (ID: {row['id']})"] = row['id']
+    # Options for selectbox: "Character Name (ID: X)"
+    # Assuming 'id' is the primary key returned by fetch_all_df
+    row_options = record_maps['row_options']
 
     selected_id_display = st.selectbox(f"Select Record to Update in '{TABLE_NAME}'",
                                             options=list(row_options.keys()),
@@ -331,30 +608,24 @@ with tab3:
                                             index=0 if row_options else None)
 
     selected_id_val = row_options.get(selected_id_display)
+    rows_by_id = record_maps['rows_by_id']
     current_record_details = None
-    if selected_id_val:
-        current_record_details = next((row for row in rows_for_select if row['id'] == selected_id_val), None)
+    if selected_id_val in rows_by_id.index:
+        current_record_details = rows_by_id.loc[selected_id_val]
 
-    if current_record_details:
+    if current_record_details is not None:
         with st.form("update_form"):
-            updated_data = {}
             for col_name, col_type in COLUMNS.items():
                 current_value = current_record_details.get(col_name)
                 # Ensure values are cast to appropriate types for Streamlit widgets
                 if col_type == "TEXT":
-                    updated_data[col_name] = st.text_input(f"{col_name.replace('_', ' ').title()}", value=str(current_value if current_value is not None else ""), key=f"update_{col_name}")
+                    st.text_input(f"{col_name.replace('_', ' ').title()}", value=str(current_value if current_value is not None else ""), key=f"update_{col_name}")
                 elif col_type == "INTEGER":
-                    updated_data[col_name] = st.number_input(f"{col_name.replace('_', ' ').title()}", min_value=0, value=int(current_value if current_value is not None else 0), step=1, key=f"update_{col_name}")
+                    st.number_input(f"{col_name.replace('_', ' ').title()}", min_value=0, value=int(current_value if current_value is not None else 0), step=1, key=f"update_{col_name}")
                 else:
-                    updated_data[col_name] = st.text_input(f"{col_name.replace('_', ' ').title()}", value=str(current_value if current_value is not None else ""), key=f"update_{col_name}")
+                    st.text_input(f"{col_name.replace('_', ' ').title()}", value=str(current_value if current_value is not None else ""), key=f"update_{col_name}")
 
-            submitted_update = st.form_submit_button("Update")
-            if submitted_update:
-                if "creature_name" in updated_data and not updated_data["creature_name"]:
-                    st.error("Character Name cannot be empty.")
-                else:
-                    update_row_record(selected_id_val, updated_data)
-                    st.rerun() # Refresh data after update
+            st.form_submit_button("Update", on_click=handle_update, args=(selected_id_val, current_record_details))
     else:
         st.info(f"No records available in '{TABLE_NAME}' to update. Add some first!")
 
@@ -362,26 +633,12 @@ with tab3:
 # --- Tab 4: Delete Record (Generic) ---
 with tab4:
     st.header(f"Delete Record from '{TABLE_NAME}'")
-    rows_for_delete = fetch_all_records()
-    
-    # Create options for selectbox: "Character Name (ID: X)"
-    row_delete_options = {}
-    for row in rows_for_delete:
-        display_name = row.get("creature_name", f"ID: {row['id']}") # Use creature_name if available, else ID
-        row_delete_options[f"{display_name} (ID: {row['id']})"] = row['id']
-
-    selected_id_to_delete_display = st.selectbox(f"Select Record to Delete from '{TABLE_NAME}'",
-                                                options=list(row_delete_options.keys()),
-                                                key="delete_select",
-                                                index=0 if row_delete_options else None)
-
-    selected_id_to_delete_val = row_delete_options.get(selected_id_to_delete_display)
+    # Same "Character Name (ID: X)" options as the Update tab
+    row_delete_options = record_maps['row_options']
 
-    if selected_id_to_delete_val:
-        st.warning(f"Are you sure you want to delete '{selected_id_to_delete_display}' and all its associated data?")
-        if st.button("Delete"): # Changed key to avoid conflict if any other button has "delete"
-            delete_row_record(selected_id_to_delete_val)
-            st.rerun() # Refresh data after deletion
+    if row_delete_options:
+        delete_picker(row_delete_options)
+        st.button("Delete", on_click=handle_delete, args=(row_delete_options,))
     else:
         st.info(f"No records available in '{TABLE_NAME}' to delete. Add some first!")
 
@@ -389,8 +646,7 @@ with tab4:
 with tab5:
     st.subheader("Transfer Gold Between Characters (Transactional)")
 
-    rows = fetch_all_records() # Re-fetch to get latest gold values
-    if not rows or len(rows) < 2:
+    if len(rows_df) < 2:
         st.warning("Not enough characters to perform a gold transfer. Please add at least 2 characters.")
         st.markdown("---") # Separator
         st.info("Add more characters to enable gold transfer.")
@@ -400,47 +656,8 @@ with tab5:
         st.number_input("Amount of Gold to Transfer", min_value=1, step=1, disabled=True, key="transfer_amount_disabled")
         st.button("Transfer Gold", disabled=True, key="transfer_gold_disabled")
     else:
-        # Create name-to-id and id-to-name/gold mappings
-        name_id_map = {f"{row['creature_name']} (ID {row['id']})": row['id'] for row in rows}
-        id_name_map = {row['id']: row['creature_name'] for row in rows}
-        id_gold_map = {row['id']: row['gold'] for row in rows}
-
-        from_name_display = st.selectbox("From (Character)", list(name_id_map.keys()), key="from_char_select")
-        to_name_options_display = [n for n in name_id_map.keys() if n != from_name_display]
-
-        if not to_name_options_display:
-            st.warning("Please select a different 'From' character to enable 'To' selection.")
-            st.selectbox("To (Character)", ["N/A"], disabled=True, key="to_char_select_disabled_2")
-            st.number_input("Amount of Gold to Transfer", min_value=1, step=1, disabled=True, key="transfer_amount_disabled_2")
-            st.button("Transfer Gold", disabled=True, key="transfer_gold_disabled_2")
-        else:
-            to_name_display = st.selectbox("To (Character)", to_name_options_display, key="to_char_select")
-
-            from_id = name_id_map.get(from_name_display)
-            to_id = name_id_map.get(to_name_display)
-
-            if from_id and to_id: # Ensure both IDs are valid before displaying info
-                st.markdown(f"**{id_name_map[from_id]}'s current gold:** {id_gold_map[from_id]} GP")
-                st.markdown(f"**{id_name_map[to_id]}'s current gold:** {id_gold_map[to_id]} GP")
-
-            amount = st.number_input(
-                "Amount of Gold to Transfer",
-                min_value=1,
-                step=1,
-                key="transfer_amount"
-            )
-
-            if st.button("Transfer Gold"):
-                if from_id == to_id:
-                    st.error("Cannot transfer gold to the same character!")
-                elif from_id and to_id and amount:
-                    success, msg = transfer_gold(from_id, to_id, amount)
-                    if success:
-                        st.success(msg)
-                    else:
-                        st.error(msg)
-                    st.rerun() # Refresh to show updated gold values
-                else:
-                    st.warning("Please select both characters and a valid amount.")
+        # Id-to-label/name/gold mappings, built column-wise from the DataFrame
+        if transfer_inputs(record_maps):
+            st.button("Transfer Gold", on_click=handle_transfer)
 
 # --- End of Streamlit UI ---
@@ -0,0 +1,28 @@
+-- Manual step: redefine the child-table foreign keys with ON DELETE CASCADE.
+-- The constraint names below are examples. Replace each DROP FOREIGN KEY name with the
+-- one SHOW CREATE TABLE reports for your database before running this file, e.g.
+-- `mysql -u root dnd_database < schema_cascade_fks.sql` (after schema_updates.sql).
+
+-- delete_row and Streamlite_Localapp.py's delete_row_record remove a character with
+-- a single DELETE on Creatures and rely on these foreign keys cascading to the child
+-- tables.
+ALTER TABLE Character_Classes
+    DROP FOREIGN KEY fk_character_classes_character,
+    ADD CONSTRAINT fk_character_classes_character FOREIGN KEY (character_id)
+        REFERENCES Characters (character_id) ON DELETE CASCADE;
+ALTER TABLE Character_Spells
+    DROP FOREIGN KEY fk_character_spells_character,
+    ADD CONSTRAINT fk_character_spells_character FOREIGN KEY (character_id)
+        REFERENCES Characters (character_id) ON DELETE CASCADE;
+ALTER TABLE Character_Combats
+    DROP FOREIGN KEY fk_character_combats_creature,
+    ADD CONSTRAINT fk_character_combats_creature FOREIGN KEY (creature_id)
+        REFERENCES Creatures (creature_id) ON DELETE CASCADE;
+ALTER TABLE Inventory
+    DROP FOREIGN KEY fk_inventory_creature,
+    ADD CONSTRAINT fk_inventory_creature FOREIGN KEY (creature_id)
+        REFERENCES Creatures (creature_id) ON DELETE CASCADE;
+ALTER TABLE Characters
+    DROP FOREIGN KEY fk_characters_creature,
+    ADD CONSTRAINT fk_characters_creature FOREIGN KEY (character_id)
+        REFERENCES Creatures (creature_id) ON DELETE CASCADE;
@@ -0,0 +1,56 @@
+-- Schema changes the Streamlit apps rely on.
+-- Run these once against dnd_database (e.g. `mysql -u root dnd_database < schema_updates.sql`).
+
+-- sp_upsert_character (below) and Streamlite_Localapp.py's insert_row_record upsert
+-- Creatures with INSERT ... ON DUPLICATE KEY UPDATE, so character names must be
+-- unique for the duplicate check to fire.
+ALTER TABLE Creatures ADD UNIQUE KEY uk_creature_name (creature_name);
+
+-- The ON DELETE CASCADE foreign keys that delete_row relies on are a separate, manual
+-- step in schema_cascade_fks.sql, because their DROP FOREIGN KEY names vary per database.
+
+-- fetch_all (and Localapp's fetch_all_df) filter on creature_type and order by
+-- creature_name. This composite index gives an index range scan in name order, so the
+-- "Using filesort" step goes away (check with EXPLAIN on SQL_FETCH_CHARACTERS or
+-- SQL_FETCH_ALL). Characters is joined on its primary key character_id, which
+-- InnoDB already clusters on.
+CREATE INDEX ix_creatures_type_name ON Creatures (creature_type, creature_name);
+
+-- insert_row adds a character with a single CALL. The procedure upserts the Creatures
+-- row, looks up the default race/class, and upserts the Characters row in one
+-- transaction, then returns (creature_id, is_new) as its result set.
+DROP PROCEDURE IF EXISTS sp_upsert_character;
+DELIMITER //
+CREATE PROCEDURE sp_upsert_character(IN p_name VARCHAR(255), IN p_gold INT)
+BEGIN
+    DECLARE v_creature_id INT;
+    DECLARE v_is_new BOOLEAN;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    -- LAST_INSERT_ID(creature_id) makes LAST_INSERT_ID() the right id on both paths
+    INSERT INTO Creatures (creature_type, creature_name, hit_points, armor_class, speed, size, level, is_homebrew)
+    VALUES ('Character', p_name, 50, 10, 30, 'Medium', 1, FALSE)
+    ON DUPLICATE KEY UPDATE creature_id = LAST_INSERT_ID(creature_id);
+    SET v_is_new = (ROW_COUNT() = 1); -- 1 = new row inserted, 0 = name already existed
+    SET v_creature_id = LAST_INSERT_ID();
+
+    INSERT INTO Characters (character_id, race_id, class_id, gold)
+    VALUES (
+        v_creature_id,
+        COALESCE((SELECT race_id FROM Races WHERE race_name = 'Human' LIMIT 1), 1),
+        COALESCE((SELECT class_id FROM Classes WHERE class_name = 'Fighter' LIMIT 1), 1),
+        p_gold
+    )
+    ON DUPLICATE KEY UPDATE gold = VALUES(gold);
+
+    COMMIT;
+
+    SELECT v_creature_id AS creature_id, v_is_new AS is_new;
+END //
+DELIMITER ;